@@ -5,6 +5,8 @@ polars DataFrames as Parquet files under `data/bronze` partitioned by
 agency and feed type.
 
 Requirements (user): pandas>=2.2.0, pyarrow>=17.0.0, polars>=1.0.0
+Optional: orjson (faster JSON parsing; falls back to the stdlib json module)
+Optional: msgspec (typed decoding that skips unused feed fields)
 
     # If filename didn't include agency, try to infer from feed content
     if meta.get("agency") == "unknown":
@@ -42,17 +44,86 @@ Requirements (user): pandas>=2.2.0, pyarrow>=17.0.0, polars>=1.0.0
 import logging
 import json
 import argparse
+import multiprocessing
+import os
 import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Literal, Optional, Union
+from types import MappingProxyType
+from typing import Deque, Dict, Iterator, List, Literal, Mapping, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
 
-import pandas as pd
 import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-logger = logging.getLogger(__name__)
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+try:
+    import msgspec
+    HAS_MSGSPEC = True
+except ImportError:
+    HAS_MSGSPEC = False
 
+logger = logging.getLogger(__name__)
 
-def parse_metadata_from_filename(path: Path) -> Dict[str, Union[str, pd.Timestamp]]:
+# Filename patterns, compiled once since they are matched for every snapshot file.
+_RE_WITH_AGENCY = re.compile(r"^gtfs_rt_(trip_updates|vehicle_positions)_(?P<agency>.+?)_(?P<ts>\d{8}_\d{6})\.json$")
+_RE_NO_AGENCY = re.compile(r"^gtfs_rt_(trip_updates|vehicle_positions)_(?P<ts>\d{8}_\d{6})\.json$")
+# Both patterns above in one, for polars' vectorised str.extract_groups.
+_FILENAME_PATTERN = r"^gtfs_rt_(?P<feed_type>trip_updates|vehicle_positions)_(?:(?P<agency>.+?)_)?(?P<ts>\d{8}_\d{6})\.json$"
+
+# Filename timestamps are JST for this sim_bridge workflow.
+_JST = ZoneInfo("Asia/Tokyo")
+
+# Output column dtypes, in output column order.
+_TU_SCHEMA: Dict[str, pl.DataType] = {
+    "snapshot_filename": pl.Utf8,
+    "snapshot_ts_jst": pl.Datetime("us", "Asia/Tokyo"),
+    "date_str_jst": pl.Utf8,
+    "agency": pl.Utf8,
+    "entity_id": pl.Utf8,
+    "trip_id": pl.Utf8,
+    "route_id": pl.Utf8,
+    "direction_id": pl.Int64,
+    "start_time": pl.Utf8,
+    "start_date": pl.Utf8,
+    "vehicle_id": pl.Utf8,
+    "tu_timestamp": pl.Int64,
+    "delay": pl.Int64,
+}
+
+_VP_SCHEMA: Dict[str, pl.DataType] = {
+    "snapshot_filename": pl.Utf8,
+    "snapshot_ts_jst": pl.Datetime("us", "Asia/Tokyo"),
+    "date_str_jst": pl.Utf8,
+    "agency": pl.Utf8,
+    "entity_id": pl.Utf8,
+    "vehicle_id": pl.Utf8,
+    "trip_id": pl.Utf8,
+    "route_id": pl.Utf8,
+    "direction_id": pl.Int64,
+    "start_time": pl.Utf8,
+    "start_date": pl.Utf8,
+    "current_stop_sequence": pl.Int64,
+    "current_status": pl.Utf8,
+    "vp_timestamp": pl.Int64,
+    "lat": pl.Float64,
+    "lon": pl.Float64,
+    "bearing": pl.Float64,
+    "speed": pl.Float64,
+}
+
+
+def parse_metadata_from_filename(path: Path) -> Dict[str, Union[str, datetime]]:
     """Parse agency, feed_type and snapshot timestamp from filename.
 
     Args:
@@ -63,37 +134,40 @@ def parse_metadata_from_filename(path: Path) -> Dict[str, Union[str, pd.Timestam
     Returns keys:
       - agency
       - feed_type
-      - snapshot_ts_jst (pd.Timestamp, tz-aware Asia/Tokyo)
+      - snapshot_ts_jst (datetime, tz-aware Asia/Tokyo)
       - date_str_jst (YYYYMMDD string, JST)
     """
     name = path.name
     # try with agency first
-    m = re.match(r"^gtfs_rt_(trip_updates|vehicle_positions)_(?P<agency>.+?)_(?P<ts>\d{8}_\d{6})\.json$", name)
+    m = _RE_WITH_AGENCY.match(name)
     if m:
         feed_type = m.group(1)
         agency = m.group("agency")
         ts_str = m.group("ts")
     else:
         # fallback: allow filenames without agency (agency will be inferred later)
-        m2 = re.match(r"^gtfs_rt_(trip_updates|vehicle_positions)_(?P<ts>\d{8}_\d{6})\.json$", name)
+        m2 = _RE_NO_AGENCY.match(name)
         if not m2:
             raise ValueError(f"Filename does not match expected pattern: {name}")
         feed_type = m2.group(1)
         agency = "unknown"
         ts_str = m2.group("ts")
-    # ts_str like 20251114_214913
+    # ts_str like 20251114_214913; the regex already guarantees the digit layout,
+    # so slice it directly instead of going through pd.to_datetime.
     try:
-        parsed = pd.to_datetime(ts_str, format="%Y%m%d_%H%M%S")
-    except Exception as exc:
+        snapshot_ts_jst = datetime(
+            int(ts_str[0:4]),
+            int(ts_str[4:6]),
+            int(ts_str[6:8]),
+            int(ts_str[9:11]),
+            int(ts_str[11:13]),
+            int(ts_str[13:15]),
+            tzinfo=_JST,
+        )
+    except ValueError as exc:
         raise ValueError(f"Invalid timestamp in filename {name}: {exc}")
 
-    # Treat filename timestamp as JST for this sim_bridge workflow.
-    if parsed.tzinfo is None:
-        snapshot_ts_jst = parsed.tz_localize("Asia/Tokyo")
-    else:
-        snapshot_ts_jst = parsed.tz_convert("Asia/Tokyo")
-
-    date_str_jst = snapshot_ts_jst.strftime("%Y%m%d")
+    date_str_jst = ts_str[:8]
 
     return {
         "agency": agency,
@@ -103,21 +177,80 @@ def parse_metadata_from_filename(path: Path) -> Dict[str, Union[str, pd.Timestam
     }
 
 
-def infer_agency_from_feed(feed: dict) -> Optional[str]:
+def _parse_metadata_batch(files: List[Path]) -> List[tuple[Path, Dict]]:
+    """Parse filename metadata for many files at once, sorted by snapshot time.
+
+    Same result as calling parse_metadata_from_filename per file, but the
+    regex match and timestamp parsing run once over all names in polars.
+    Files whose name or timestamp does not parse are logged and left out.
+    """
+    meta_df = (
+        pl.DataFrame({"idx": range(len(files)), "name": [p.name for p in files]})
+        .with_columns(pl.col("name").str.extract_groups(_FILENAME_PATTERN).alias("m"))
+        .unnest("m")
+        .with_columns(
+            pl.col("agency").fill_null("unknown"),
+            pl.col("ts")
+            .str.strptime(pl.Datetime("us"), "%Y%m%d_%H%M%S", strict=False)
+            .dt.replace_time_zone("Asia/Tokyo")
+            .alias("snapshot_ts_jst"),
+            pl.col("ts").str.slice(0, 8).alias("date_str_jst"),
+        )
+    )
+    for i in meta_df.filter(pl.col("snapshot_ts_jst").is_null())["idx"]:
+        logger.warning("Skipping file with invalid filename: %s", files[i])
+
+    rows = (
+        meta_df.filter(pl.col("snapshot_ts_jst").is_not_null())
+        .sort("snapshot_ts_jst", maintain_order=True)
+        .select("idx", "agency", "feed_type", "snapshot_ts_jst", "date_str_jst")
+        .iter_rows()
+    )
+    return [
+        (files[i], {"agency": agency, "feed_type": ft, "snapshot_ts_jst": ts, "date_str_jst": date_str})
+        for i, agency, ft, ts, date_str in rows
+    ]
+
+
+# Shared read-only stand-in for missing sub-objects in the dict-path column
+# extractors, so `x.get(...) or _EMPTY_DICT` does not allocate a dict per entity.
+_EMPTY_DICT: Mapping = MappingProxyType({})
+
+_DASH_DOT_TRANS = str.maketrans({"-": "_", ".": "_"})
+
+
+@lru_cache(maxsize=4096)
+def _agency_from_vid(vid: str) -> str:
+    """Return the agency prefix of a vehicle id, e.g. 'chitetsu_tram_5007' -> 'chitetsu_tram'.
+
+    Cached because the same handful of prefixes repeat across every entity of a feed.
+    """
+    parts = vid.translate(_DASH_DOT_TRANS).split("_", 2)
+    return "_".join(parts[:2]) if len(parts) >= 2 else parts[0]
+
+
+def infer_agency_from_feed(feed: dict, max_entities: Optional[int] = 4) -> Optional[str]:
     """Infer agency string from FeedMessage content.
 
     Heuristics:
       - Check vehicle ids in entities (trip_update.vehicle.id, vehicle.vehicle.id, vehicle.id).
       - For ids like 'chitetsu_tram_5007' return 'chitetsu_tram'.
       - For ids like 'chitetsu_bus-5007' or 'chitetsu_bus.5007' normalize separators to underscore.
+      - Fall back to flat `trip_updates` / `vehicle_positions` lists when there are no entities.
+
+    Args:
+        feed: decoded FeedMessage JSON.
+        max_entities: how many entities (or flat list items) to look at before
+            giving up; None scans them all. Vehicle ids of one feed share the
+            agency prefix, so the first few entities are enough.
 
-    Returns agency or None.
+    Returns the agency of the first vehicle id found, or None.
     """
     if not isinstance(feed, dict):
         return None
     # 1) legacy entity list
-    entities = feed.get("entity", [])
-    for ent in entities:
+    entities = feed.get("entity") or []
+    for ent in islice(entities, max_entities):
         # trip_update vehicle
         if "trip_update" in ent:
             tu = ent.get("trip_update", {})
@@ -125,14 +258,7 @@ def infer_agency_from_feed(feed: dict) -> Optional[str]:
             if isinstance(vehicle, dict):
                 vid = vehicle.get("id")
                 if vid:
-                    v = str(vid)
-                    # normalize separators
-                    v = v.replace("-", "_").replace(".", "_")
-                    parts = v.split("_")
-                    if len(parts) >= 2:
-                        return "_".join(parts[:2])
-                    if parts:
-                        return parts[0]
+                    return _agency_from_vid(str(vid))
         # vehicle entity
         if "vehicle" in ent:
             veh = ent.get("vehicle", {})
@@ -143,87 +269,417 @@ def infer_agency_from_feed(feed: dict) -> Optional[str]:
             elif isinstance(veh, dict):
                 vid = veh.get("id")
             if vid:
-                v = str(vid).replace("-", "_").replace(".", "_")
-                parts = v.split("_")
-                if len(parts) >= 2:
-                    return "_".join(parts[:2])
-                if parts:
-                    return parts[0]
-        # 2) direct trip_updates list (flat list of dicts)
-        tus = feed.get("trip_updates")
-        if isinstance(tus, list):
-            for tu in tus:
-                vid = tu.get("vehicle_id") or (tu.get("vehicle") and tu.get("vehicle").get("id"))
-                if vid:
-                    v = str(vid).replace("-", "_").replace(".", "_")
-                    parts = v.split("_")
-                    if len(parts) >= 2:
-                        return "_".join(parts[:2])
-                    if parts:
-                        return parts[0]
-
-        # 3) direct vehicle_positions list
-        vps = feed.get("vehicle_positions")
-        if isinstance(vps, list):
-            for vp in vps:
-                posveh = vp.get("vehicle") or vp
-                vid = None
-                if isinstance(posveh, dict):
-                    vid = posveh.get("vehicle_id") or posveh.get("vehicle", {}).get("id") or posveh.get("id")
-                if vid:
-                    v = str(vid).replace("-", "_").replace(".", "_")
-                    parts = v.split("_")
-                    if len(parts) >= 2:
-                        return "_".join(parts[:2])
-                    if parts:
-                        return parts[0]
+                return _agency_from_vid(str(vid))
 
-        return None
+    # 2) direct trip_updates list (flat list of dicts)
+    tus = feed.get("trip_updates")
+    if isinstance(tus, list):
+        for tu in islice(tus, max_entities):
+            vid = tu.get("vehicle_id") or (tu.get("vehicle") and tu.get("vehicle").get("id"))
+            if vid:
+                return _agency_from_vid(str(vid))
+
+    # 3) direct vehicle_positions list
+    vps = feed.get("vehicle_positions")
+    if isinstance(vps, list):
+        for vp in islice(vps, max_entities):
+            posveh = vp.get("vehicle") or vp
+            vid = None
+            if isinstance(posveh, dict):
+                vid = posveh.get("vehicle_id") or posveh.get("vehicle", {}).get("id") or posveh.get("id")
+            if vid:
+                return _agency_from_vid(str(vid))
+
+    return None
 
 
 def _empty_trip_updates_df() -> pl.DataFrame:
     """Return an empty trip_updates DataFrame with expected columns."""
-    cols = {
-        "snapshot_filename": [],
-        "snapshot_ts_jst": [],
-        "date_str_jst": [],
-        "agency": [],
-        "entity_id": [],
-        "trip_id": [],
-        "route_id": [],
-        "direction_id": [],
-        "start_time": [],
-        "start_date": [],
-        "vehicle_id": [],
-        "tu_timestamp": [],
-        "delay": [],
-    }
-    return pl.DataFrame(cols)
+    return pl.DataFrame(schema=_TU_SCHEMA)
 
 
 def _empty_vehicle_positions_df() -> pl.DataFrame:
     """Return an empty vehicle_positions DataFrame with expected columns."""
-    cols = {
-        "snapshot_filename": [],
-        "snapshot_ts_jst": [],
-        "date_str_jst": [],
-        "agency": [],
-        "entity_id": [],
-        "vehicle_id": [],
-        "trip_id": [],
-        "route_id": [],
-        "direction_id": [],
-        "start_time": [],
-        "start_date": [],
-        "current_stop_sequence": [],
-        "current_status": [],
-        "vp_timestamp": [],
-        "lat": [],
-        "lon": [],
-        "bearing": [],
-        "speed": [],
+    return pl.DataFrame(schema=_VP_SCHEMA)
+
+
+_TU_DECODER = None
+_VP_DECODER = None
+if HAS_MSGSPEC:
+    # Typed views of the feed JSON: only the fields the loaders read are
+    # declared, so msgspec skips everything else (e.g. stop_time_update)
+    # instead of building dicts for it. Protobuf's MessageToDict emits uint64
+    # timestamps as strings, hence the int/str unions.
+
+    class _TripDescriptor(msgspec.Struct):
+        trip_id: Optional[str] = None
+        route_id: Optional[str] = None
+        direction_id: Optional[int] = None
+        start_time: Optional[str] = None
+        start_date: Optional[str] = None
+
+    class _VehicleDescriptor(msgspec.Struct):
+        id: Optional[str] = None
+
+    class _Position(msgspec.Struct):
+        latitude: Optional[float] = None
+        longitude: Optional[float] = None
+        bearing: Optional[float] = None
+        speed: Optional[float] = None
+
+    class _TripUpdate(msgspec.Struct):
+        trip: Optional[_TripDescriptor] = None
+        vehicle: Optional[_VehicleDescriptor] = None
+        timestamp: Union[int, str, None] = None
+        delay: Optional[int] = None
+
+    class _VehiclePosition(msgspec.Struct):
+        id: Optional[str] = None
+        trip: Optional[_TripDescriptor] = None
+        vehicle: Optional[_VehicleDescriptor] = None
+        position: Optional[_Position] = None
+        current_stop_sequence: Optional[int] = None
+        current_status: Union[int, str, None] = None
+        timestamp: Union[int, str, None] = None
+
+    class _FlatTripUpdate(msgspec.Struct):
+        trip_id: Optional[str] = None
+        route_id: Optional[str] = None
+        direction_id: Optional[int] = None
+        start_time: Optional[str] = None
+        start_date: Optional[str] = None
+        vehicle_id: Optional[str] = None
+        vehicle: Optional[_VehicleDescriptor] = None
+        timestamp: Union[int, str, None] = None
+        delay: Optional[int] = None
+
+    class _FlatVehiclePosition(msgspec.Struct):
+        vehicle_id: Optional[str] = None
+        vehicle: Optional[_VehicleDescriptor] = None
+        trip: Optional[_TripDescriptor] = None
+        position: Optional[_Position] = None
+        current_stop_sequence: Optional[int] = None
+        current_status: Union[int, str, None] = None
+        timestamp: Union[int, str, None] = None
+
+    class _TripUpdateEntity(msgspec.Struct):
+        id: Optional[str] = None
+        trip_update: Optional[_TripUpdate] = None
+
+    class _VehiclePositionEntity(msgspec.Struct):
+        id: Optional[str] = None
+        vehicle: Optional[_VehiclePosition] = None
+
+    class _TripUpdateFeed(msgspec.Struct):
+        entity: List[_TripUpdateEntity] = []
+        trip_updates: Optional[List[_FlatTripUpdate]] = None
+
+    class _VehiclePositionFeed(msgspec.Struct):
+        entity: List[_VehiclePositionEntity] = []
+        vehicle_positions: Optional[List[_FlatVehiclePosition]] = None
+
+    _EMPTY_TRIP = _TripDescriptor()
+    _EMPTY_POSITION = _Position()
+    _TU_DECODER = msgspec.json.Decoder(_TripUpdateFeed)
+    _VP_DECODER = msgspec.json.Decoder(_VehiclePositionFeed)
+
+
+def _decode_typed(raw: bytes, decoder) -> Optional[object]:
+    """Decode raw JSON with a typed msgspec decoder, or return None.
+
+    None means the caller should use the generic dict path: msgspec is not
+    installed, or the payload does not fit the declared Structs.
+    """
+    if decoder is None:
+        return None
+    try:
+        return decoder.decode(raw)
+    except msgspec.DecodeError:
+        return None
+
+
+def _trip_update_columns(feed: dict) -> Dict[str, list]:
+    """Extract per-entity trip_update columns from a decoded JSON dict."""
+    # Accumulate one list per column; the frame is built once at the end.
+    entity_ids: List[Optional[str]] = []
+    trip_ids: List[Optional[str]] = []
+    route_ids: List[Optional[str]] = []
+    direction_ids: List[Optional[int]] = []
+    start_times: List[Optional[str]] = []
+    start_dates: List[Optional[str]] = []
+    vehicle_ids: List[Optional[str]] = []
+    tu_timestamps: List[Optional[int]] = []
+    delays: List[Optional[int]] = []
+
+    # Some JSON dumps use a flat 'trip_updates' list instead of entity wrappers
+    tus = feed.get("trip_updates") if isinstance(feed, dict) else None
+    if isinstance(tus, list):
+        # Flat items use 'vehicle_id' or a nested 'vehicle': {'id': ..}.
+        for tu in tus:
+            entity_ids.append(None)
+            trip_ids.append(tu.get("trip_id"))
+            route_ids.append(tu.get("route_id"))
+            direction_ids.append(tu.get("direction_id"))
+            start_times.append(tu.get("start_time"))
+            start_dates.append(tu.get("start_date"))
+            vehicle_ids.append(tu.get("vehicle_id") or (tu.get("vehicle") or _EMPTY_DICT).get("id"))
+            tu_timestamps.append(tu.get("timestamp"))
+            delays.append(tu.get("delay"))
+    else:
+        for ent in feed.get("entity", []):
+            if "trip_update" not in ent:
+                continue
+            tu = ent.get("trip_update", _EMPTY_DICT)
+            trip = tu.get("trip") or _EMPTY_DICT
+            vehicle = tu.get("vehicle") or _EMPTY_DICT
+            entity_ids.append(ent.get("id"))
+            trip_ids.append(trip.get("trip_id"))
+            route_ids.append(trip.get("route_id"))
+            direction_ids.append(trip.get("direction_id"))
+            start_times.append(trip.get("start_time"))
+            start_dates.append(trip.get("start_date"))
+            vehicle_ids.append(vehicle.get("id"))
+            tu_timestamps.append(tu.get("timestamp"))
+            delays.append(tu.get("delay"))
+
+    return {
+        "entity_id": entity_ids,
+        "trip_id": trip_ids,
+        "route_id": route_ids,
+        "direction_id": direction_ids,
+        "start_time": start_times,
+        "start_date": start_dates,
+        "vehicle_id": vehicle_ids,
+        "tu_timestamp": tu_timestamps,
+        "delay": delays,
+    }
+
+
+def _trip_update_columns_typed(feed: "_TripUpdateFeed") -> Dict[str, list]:
+    """Extract per-entity trip_update columns from a msgspec-decoded feed."""
+    entity_ids: List[Optional[str]] = []
+    trip_ids: List[Optional[str]] = []
+    route_ids: List[Optional[str]] = []
+    direction_ids: List[Optional[int]] = []
+    start_times: List[Optional[str]] = []
+    start_dates: List[Optional[str]] = []
+    vehicle_ids: List[Optional[str]] = []
+    tu_timestamps: List[Union[int, str, None]] = []
+    delays: List[Optional[int]] = []
+
+    if feed.trip_updates is not None:
+        for tu in feed.trip_updates:
+            entity_ids.append(None)
+            trip_ids.append(tu.trip_id)
+            route_ids.append(tu.route_id)
+            direction_ids.append(tu.direction_id)
+            start_times.append(tu.start_time)
+            start_dates.append(tu.start_date)
+            vehicle_ids.append(tu.vehicle_id or (tu.vehicle.id if tu.vehicle is not None else None))
+            tu_timestamps.append(tu.timestamp)
+            delays.append(tu.delay)
+    else:
+        for ent in feed.entity:
+            tu = ent.trip_update
+            if tu is None:
+                continue
+            trip = tu.trip or _EMPTY_TRIP
+            entity_ids.append(ent.id)
+            trip_ids.append(trip.trip_id)
+            route_ids.append(trip.route_id)
+            direction_ids.append(trip.direction_id)
+            start_times.append(trip.start_time)
+            start_dates.append(trip.start_date)
+            vehicle_ids.append(tu.vehicle.id if tu.vehicle is not None else None)
+            tu_timestamps.append(tu.timestamp)
+            delays.append(tu.delay)
+
+    return {
+        "entity_id": entity_ids,
+        "trip_id": trip_ids,
+        "route_id": route_ids,
+        "direction_id": direction_ids,
+        "start_time": start_times,
+        "start_date": start_dates,
+        "vehicle_id": vehicle_ids,
+        "tu_timestamp": tu_timestamps,
+        "delay": delays,
     }
-    return pl.DataFrame(cols)
+
+
+def _vehicle_position_columns(feed: dict) -> Dict[str, list]:
+    """Extract per-entity vehicle_position columns from a decoded JSON dict."""
+    # Accumulate one list per column; the frame is built once at the end.
+    entity_ids: List[Optional[str]] = []
+    vehicle_ids: List[Optional[str]] = []
+    trip_ids: List[Optional[str]] = []
+    route_ids: List[Optional[str]] = []
+    direction_ids: List[Optional[int]] = []
+    start_times: List[Optional[str]] = []
+    start_dates: List[Optional[str]] = []
+    current_stop_sequences: List[Optional[int]] = []
+    current_statuses: List[Optional[str]] = []
+    vp_timestamps: List[Optional[int]] = []
+    lats: List[Optional[float]] = []
+    lons: List[Optional[float]] = []
+    bearings: List[Optional[float]] = []
+    speeds: List[Optional[float]] = []
+
+    # Some JSON dumps use a flat 'vehicle_positions' list instead of entity wrappers
+    if isinstance(feed, dict) and isinstance(feed.get("vehicle_positions"), list):
+        for v in feed.get("vehicle_positions", []):
+            pos = v.get("position") or _EMPTY_DICT
+            trip = v.get("trip") or _EMPTY_DICT
+            entity_ids.append(None)
+            vehicle_ids.append(v.get("vehicle_id") or (v.get("vehicle") and v.get("vehicle").get("id")))
+            trip_ids.append(trip.get("trip_id"))
+            route_ids.append(trip.get("route_id"))
+            direction_ids.append(trip.get("direction_id"))
+            start_times.append(trip.get("start_time"))
+            start_dates.append(trip.get("start_date"))
+            current_stop_sequences.append(v.get("current_stop_sequence"))
+            current_statuses.append(v.get("current_status"))
+            vp_timestamps.append(v.get("timestamp"))
+            lats.append(pos.get("latitude"))
+            lons.append(pos.get("longitude"))
+            bearings.append(pos.get("bearing"))
+            speeds.append(pos.get("speed"))
+    else:
+        for ent in feed.get("entity", []):
+            if "vehicle" not in ent:
+                continue
+            vehicle = ent.get("vehicle", _EMPTY_DICT)
+            nested = vehicle.get("vehicle")
+            pos = vehicle.get("position") or _EMPTY_DICT
+            trip = vehicle.get("trip") or _EMPTY_DICT
+            entity_ids.append(ent.get("id"))
+            # some encodings put vehicle id at vehicle.vehicle.id or vehicle.id
+            vid = nested.get("id") if nested else None
+            vehicle_ids.append(vehicle.get("id") if vid is None else vid)
+            trip_ids.append(trip.get("trip_id"))
+            route_ids.append(trip.get("route_id"))
+            direction_ids.append(trip.get("direction_id"))
+            start_times.append(trip.get("start_time"))
+            start_dates.append(trip.get("start_date"))
+            current_stop_sequences.append(vehicle.get("current_stop_sequence"))
+            current_statuses.append(vehicle.get("current_status"))
+            vp_timestamps.append(vehicle.get("timestamp"))
+            lats.append(pos.get("latitude"))
+            lons.append(pos.get("longitude"))
+            bearings.append(pos.get("bearing"))
+            speeds.append(pos.get("speed"))
+
+    return {
+        "entity_id": entity_ids,
+        "vehicle_id": vehicle_ids,
+        "trip_id": trip_ids,
+        "route_id": route_ids,
+        "direction_id": direction_ids,
+        "start_time": start_times,
+        "start_date": start_dates,
+        "current_stop_sequence": current_stop_sequences,
+        "current_status": current_statuses,
+        "vp_timestamp": vp_timestamps,
+        "lat": lats,
+        "lon": lons,
+        "bearing": bearings,
+        "speed": speeds,
+    }
+
+
+def _vehicle_position_columns_typed(feed: "_VehiclePositionFeed") -> Dict[str, list]:
+    """Extract per-entity vehicle_position columns from a msgspec-decoded feed."""
+    entity_ids: List[Optional[str]] = []
+    vehicle_ids: List[Optional[str]] = []
+    trip_ids: List[Optional[str]] = []
+    route_ids: List[Optional[str]] = []
+    direction_ids: List[Optional[int]] = []
+    start_times: List[Optional[str]] = []
+    start_dates: List[Optional[str]] = []
+    current_stop_sequences: List[Optional[int]] = []
+    current_statuses: List[Union[int, str, None]] = []
+    vp_timestamps: List[Union[int, str, None]] = []
+    lats: List[Optional[float]] = []
+    lons: List[Optional[float]] = []
+    bearings: List[Optional[float]] = []
+    speeds: List[Optional[float]] = []
+
+    if feed.vehicle_positions is not None:
+        for v in feed.vehicle_positions:
+            trip = v.trip or _EMPTY_TRIP
+            pos = v.position or _EMPTY_POSITION
+            entity_ids.append(None)
+            vehicle_ids.append(v.vehicle_id or (v.vehicle.id if v.vehicle is not None else None))
+            trip_ids.append(trip.trip_id)
+            route_ids.append(trip.route_id)
+            direction_ids.append(trip.direction_id)
+            start_times.append(trip.start_time)
+            start_dates.append(trip.start_date)
+            current_stop_sequences.append(v.current_stop_sequence)
+            current_statuses.append(v.current_status)
+            vp_timestamps.append(v.timestamp)
+            lats.append(pos.latitude)
+            lons.append(pos.longitude)
+            bearings.append(pos.bearing)
+            speeds.append(pos.speed)
+    else:
+        for ent in feed.entity:
+            v = ent.vehicle
+            if v is None:
+                continue
+            trip = v.trip or _EMPTY_TRIP
+            pos = v.position or _EMPTY_POSITION
+            entity_ids.append(ent.id)
+            # some encodings put vehicle id at vehicle.vehicle.id or vehicle.id;
+            # an empty nested vehicle decodes to a descriptor with id None.
+            vid = v.vehicle.id if v.vehicle is not None else None
+            vehicle_ids.append(v.id if vid is None else vid)
+            trip_ids.append(trip.trip_id)
+            route_ids.append(trip.route_id)
+            direction_ids.append(trip.direction_id)
+            start_times.append(trip.start_time)
+            start_dates.append(trip.start_date)
+            current_stop_sequences.append(v.current_stop_sequence)
+            current_statuses.append(v.current_status)
+            vp_timestamps.append(v.timestamp)
+            lats.append(pos.latitude)
+            lons.append(pos.longitude)
+            bearings.append(pos.bearing)
+            speeds.append(pos.speed)
+
+    return {
+        "entity_id": entity_ids,
+        "vehicle_id": vehicle_ids,
+        "trip_id": trip_ids,
+        "route_id": route_ids,
+        "direction_id": direction_ids,
+        "start_time": start_times,
+        "start_date": start_dates,
+        "current_stop_sequence": current_stop_sequences,
+        "current_status": current_statuses,
+        "vp_timestamp": vp_timestamps,
+        "lat": lats,
+        "lon": lons,
+        "bearing": bearings,
+        "speed": speeds,
+    }
+
+
+def _frame_from_columns(path: Path, meta: Dict, cols: Dict[str, list], schema: Dict[str, pl.DataType]) -> pl.DataFrame:
+    """Build a loader frame from per-entity columns plus the snapshot metadata columns.
+
+    The metadata is the same for every row of a snapshot, so it is added as
+    literal columns instead of being repeated into Python lists. Evaluating
+    these expressions inside a forked worker deadlocks polars, so process
+    pools that call the loaders (here and in tar2parquet) must spawn.
+    """
+    df = pl.DataFrame(cols, schema={name: schema[name] for name in cols}, strict=False)
+    return df.with_columns(
+        pl.lit(path.name, dtype=pl.Utf8).alias("snapshot_filename"),
+        pl.lit(meta["snapshot_ts_jst"], dtype=schema["snapshot_ts_jst"]).alias("snapshot_ts_jst"),
+        pl.lit(meta["date_str_jst"], dtype=pl.Utf8).alias("date_str_jst"),
+        pl.lit(meta["agency"], dtype=pl.Utf8).alias("agency"),
+    ).select(list(schema))
 
 
 def load_trip_updates_from_json(path: Path) -> pl.DataFrame:
@@ -245,85 +701,35 @@ def load_trip_updates_from_json(path: Path) -> pl.DataFrame:
     except ValueError as exc:
         logger.warning("Skipping file with invalid name '%s': %s", path, exc)
         return _empty_trip_updates_df()
+    return _load_trip_updates_with_meta(path, meta)
+
 
+def _load_trip_updates_with_meta(path: Path, meta: Dict) -> pl.DataFrame:
+    """Load trip_updates for a file whose filename metadata is already parsed."""
     try:
-        with path.open("r", encoding="utf-8") as fh:
-            feed = json.load(fh)
+        raw = path.read_bytes()
+        # Agency inference walks the raw dicts, so only take the typed path
+        # when the filename already names the agency.
+        typed = _decode_typed(raw, _TU_DECODER) if meta.get("agency") != "unknown" else None
+        feed = _loads(raw) if typed is None else None
     except Exception as exc:
         logger.warning("Failed to read JSON %s: %s", path, exc)
         return _empty_trip_updates_df()
-    # If filename didn't include agency, try to infer from feed content
-    if meta.get("agency") == "unknown":
-        inferred = infer_agency_from_feed(feed)
-        if inferred:
-            meta["agency"] = inferred
-
-    # Some JSON dumps use a flat 'trip_updates' list instead of entity wrappers
-    if isinstance(feed, dict) and isinstance(feed.get("trip_updates"), list):
-        rows = []
-        for tu in feed.get("trip_updates", []):
-            # tu may be a dict with fields similar to entity.trip_update
-            vehicle_id = None
-            # flat items sometimes use 'vehicle_id' or nested 'vehicle': {'id': ..}
-            if isinstance(tu, dict):
-                vehicle_id = tu.get("vehicle_id") or (tu.get("vehicle") and (tu.get("vehicle").get("id") if isinstance(tu.get("vehicle"), dict) else None))
-            row = {
-                "snapshot_filename": path.name,
-                "snapshot_ts_jst": meta["snapshot_ts_jst"],
-                "date_str_jst": meta["date_str_jst"],
-                "agency": meta["agency"],
-                "entity_id": None,
-                "trip_id": tu.get("trip_id") if isinstance(tu, dict) else None,
-                "route_id": tu.get("route_id") if isinstance(tu, dict) else None,
-                "direction_id": tu.get("direction_id") if isinstance(tu, dict) else None,
-                "start_time": tu.get("start_time") if isinstance(tu, dict) else None,
-                "start_date": tu.get("start_date") if isinstance(tu, dict) else None,
-                "vehicle_id": vehicle_id,
-                "tu_timestamp": tu.get("timestamp") if isinstance(tu, dict) else None,
-                "delay": tu.get("delay") if isinstance(tu, dict) else None,
-            }
-            rows.append(row)
-        if not rows:
-            return _empty_trip_updates_df()
-        try:
-            return pl.DataFrame(rows)
-        except Exception:
-            return pl.from_dicts(rows)
 
-    entities = feed.get("entity", [])
-    rows: List[Dict] = []
-    for ent in entities:
-        if "trip_update" not in ent:
-            continue
-        tu = ent.get("trip_update", {})
-        trip = tu.get("trip", {})
-        vehicle = tu.get("vehicle", {}) or {}
-        row = {
-            "snapshot_filename": path.name,
-            "snapshot_ts_jst": meta["snapshot_ts_jst"],
-            "date_str_jst": meta["date_str_jst"],
-            "agency": meta["agency"],
-            "entity_id": ent.get("id"),
-            "trip_id": trip.get("trip_id") if trip else None,
-            "route_id": trip.get("route_id") if trip else None,
-            "direction_id": trip.get("direction_id") if trip else None,
-            "start_time": trip.get("start_time") if trip else None,
-            "start_date": trip.get("start_date") if trip else None,
-            "vehicle_id": vehicle.get("id") if vehicle else None,
-            "tu_timestamp": tu.get("timestamp"),
-            "delay": tu.get("delay"),
-        }
-        rows.append(row)
-
-    if not rows:
+    if typed is not None:
+        cols = _trip_update_columns_typed(typed)
+    else:
+        # Only filenames without an agency need inference; the usual
+        # gtfs_rt_{feed_type}_{agency}_... names never pay for it.
+        if meta.get("agency") == "unknown":
+            inferred = infer_agency_from_feed(feed)
+            if inferred:
+                meta["agency"] = inferred
+        cols = _trip_update_columns(feed)
+
+    if not cols["trip_id"]:
         return _empty_trip_updates_df()
-
-    try:
-        df = pl.DataFrame(rows)
-    except Exception:
-        # fallback: construct via from_dicts
-        df = pl.from_dicts(rows)
-    return df
+    return _frame_from_columns(path, meta, cols, _TU_SCHEMA)
 
 
 def load_vehicle_positions_from_json(path: Path) -> pl.DataFrame:
@@ -349,143 +755,186 @@ def load_vehicle_positions_from_json(path: Path) -> pl.DataFrame:
     except ValueError as exc:
         logger.warning("Skipping file with invalid name '%s': %s", path, exc)
         return _empty_vehicle_positions_df()
+    return _load_vehicle_positions_with_meta(path, meta)
+
 
+def _load_vehicle_positions_with_meta(path: Path, meta: Dict) -> pl.DataFrame:
+    """Load vehicle_positions for a file whose filename metadata is already parsed."""
     try:
-        with path.open("r", encoding="utf-8") as fh:
-            feed = json.load(fh)
+        raw = path.read_bytes()
+        # Agency inference walks the raw dicts, so only take the typed path
+        # when the filename already names the agency.
+        typed = _decode_typed(raw, _VP_DECODER) if meta.get("agency") != "unknown" else None
+        feed = _loads(raw) if typed is None else None
     except Exception as exc:
         logger.warning("Failed to read JSON %s: %s", path, exc)
         return _empty_vehicle_positions_df()
-    # If filename didn't include agency, try to infer from feed content
-    if meta.get("agency") == "unknown":
-        inferred = infer_agency_from_feed(feed)
-        if inferred:
-            meta["agency"] = inferred
 
-    # Some JSON dumps use a flat 'vehicle_positions' list instead of entity wrappers
-    if isinstance(feed, dict) and isinstance(feed.get("vehicle_positions"), list):
-        rows = []
-        for v in feed.get("vehicle_positions", []):
-            pos = v.get("position") or {}
-            row = {
-                "snapshot_filename": path.name,
-                "snapshot_ts_jst": meta["snapshot_ts_jst"],
-                "date_str_jst": meta["date_str_jst"],
-                "agency": meta["agency"],
-                "entity_id": None,
-                "vehicle_id": v.get("vehicle_id") or (v.get("vehicle") and v.get("vehicle").get("id")),
-                "trip_id": (v.get("trip") or {}).get("trip_id"),
-                "route_id": (v.get("trip") or {}).get("route_id"),
-                "direction_id": (v.get("trip") or {}).get("direction_id"),
-                "start_time": (v.get("trip") or {}).get("start_time"),
-                "start_date": (v.get("trip") or {}).get("start_date"),
-                "current_stop_sequence": v.get("current_stop_sequence"),
-                "current_status": v.get("current_status"),
-                "vp_timestamp": v.get("timestamp"),
-                "lat": pos.get("latitude"),
-                "lon": pos.get("longitude"),
-                "bearing": pos.get("bearing"),
-                "speed": pos.get("speed"),
-            }
-            rows.append(row)
-        if not rows:
-            return _empty_vehicle_positions_df()
-        try:
-            return pl.DataFrame(rows)
-        except Exception:
-            return pl.from_dicts(rows)
-    entities = feed.get("entity", [])
-    rows: List[Dict] = []
-    for ent in entities:
-        if "vehicle" not in ent:
-            continue
-        vehicle = ent.get("vehicle", {})
-        pos = vehicle.get("position") or {}
-        row = {
-            "snapshot_filename": path.name,
-            "snapshot_ts_jst": meta["snapshot_ts_jst"],
-            "date_str_jst": meta["date_str_jst"],
-            "agency": meta["agency"],
-            "entity_id": ent.get("id"),
-            "vehicle_id": vehicle.get("vehicle", {}).get("id") if vehicle.get("vehicle") else vehicle.get("id") or vehicle.get("id"),
-            # some encodings put vehicle id at vehicle.vehicle.id or vehicle.id
-            "trip_id": (vehicle.get("trip") or {}).get("trip_id"),
-            "route_id": (vehicle.get("trip") or {}).get("route_id"),
-            "direction_id": (vehicle.get("trip") or {}).get("direction_id"),
-            "start_time": (vehicle.get("trip") or {}).get("start_time"),
-            "start_date": (vehicle.get("trip") or {}).get("start_date"),
-            "current_stop_sequence": vehicle.get("current_stop_sequence"),
-            "current_status": vehicle.get("current_status"),
-            "vp_timestamp": vehicle.get("timestamp"),
-            "lat": pos.get("latitude"),
-            "lon": pos.get("longitude"),
-            "bearing": pos.get("bearing"),
-            "speed": pos.get("speed"),
-        }
-        rows.append(row)
-
-    if not rows:
+    if typed is not None:
+        cols = _vehicle_position_columns_typed(typed)
+    else:
+        # Only filenames without an agency need inference; the usual
+        # gtfs_rt_{feed_type}_{agency}_... names never pay for it.
+        if meta.get("agency") == "unknown":
+            inferred = infer_agency_from_feed(feed)
+            if inferred:
+                meta["agency"] = inferred
+        cols = _vehicle_position_columns(feed)
+
+    if not cols["trip_id"]:
         return _empty_vehicle_positions_df()
+    return _frame_from_columns(path, meta, cols, _VP_SCHEMA)
+
 
+def _load_snapshot(path: Path, meta: Dict, feed_type: str) -> pl.DataFrame:
+    """Load one snapshot file, returning an empty frame on failure.
+
+    Module-level (and therefore picklable) so it can run in worker processes.
+    """
     try:
-        df = pl.DataFrame(rows)
-    except Exception:
-        df = pl.from_dicts(rows)
-    return df
+        if feed_type == "trip_updates":
+            return _load_trip_updates_with_meta(path, meta)
+        return _load_vehicle_positions_with_meta(path, meta)
+    except Exception as exc:
+        logger.exception("Failed to process %s: %s", path, exc)
+        return _empty_trip_updates_df() if feed_type == "trip_updates" else _empty_vehicle_positions_df()
+
+
+def _iter_snapshots(root: Path, prefix: str) -> Iterator[Path]:
+    """Yield `{prefix}*.json` files under root, recursively.
+
+    A plain os.scandir walk with string prefix/suffix checks; cheaper than
+    Path.rglob, which fnmatches every entry and builds a Path for each one.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    if e.is_dir(follow_symlinks=False):
+                        stack.append(e.path)
+                    elif e.name.startswith(prefix) and e.name.endswith(".json"):
+                        yield Path(e.path)
+        except OSError as exc:
+            logger.warning("Cannot list directory %s: %s", d, exc)
 
 
-def load_all_snapshots(base_dir: Path, feed_type: Literal["trip_updates", "vehicle_positions"]) -> pl.DataFrame:
+def _select_snapshots(base_dir: Path, feed_type: str, agency_filter: Optional[str]) -> List[tuple[Path, Dict]]:
+    """List the snapshot files of feed_type under base_dir with their filename metadata.
+
+    Agency from the filename is final, so files naming another agency than
+    agency_filter are dropped here; "unknown" is only resolved after reading.
+    """
+    prefix = f"gtfs_rt_{feed_type}_"
+    files = list(_iter_snapshots(base_dir, prefix))
+    if not files:
+        logger.info("No files found for pattern %s*.json under %s", prefix, base_dir)
+        return []
+    return [
+        (p, meta)
+        for p, meta in _parse_metadata_batch(files)
+        if not agency_filter or meta["agency"] in (agency_filter, "unknown")
+    ]
+
+
+def _iter_loaded(
+    metas: List[tuple[Path, Dict]],
+    feed_type: str,
+    workers: Optional[int],
+    agency_filter: Optional[str],
+) -> Iterator[pl.DataFrame]:
+    """Yield the non-empty snapshot frames of metas, in snapshot order.
+
+    Files are parsed across `workers` processes (None = os.cpu_count(),
+    1 = sequential); fewer than 4 files are always parsed sequentially.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(metas) >= 4:
+        return _keep_agency(_iter_parallel(metas, feed_type, workers), agency_filter)
+    return _keep_agency((_load_snapshot(p, meta, feed_type) for p, meta in metas), agency_filter)
+
+
+def _iter_parallel(metas: List[tuple[Path, Dict]], feed_type: str, workers: int) -> Iterator[pl.DataFrame]:
+    """Parse snapshots in worker processes, yielding their frames in snapshot order.
+
+    Only about two files per worker are in flight at a time, so parsed frames
+    cannot pile up here while the consumer is busy writing. If the consumer
+    stops early, files not yet started are cancelled.
+    """
+    # Workers are spawned, not forked: polars' thread pool is already running
+    # here, and forking a process that holds it deadlocks the children. The
+    # already-parsed metadata is passed along so the filename is not parsed a
+    # second time.
+    ex = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    pending: Deque[Future] = deque()
+    try:
+        for p, meta in metas:
+            pending.append(ex.submit(_load_snapshot, p, meta, feed_type))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        ex.shutdown(wait=True, cancel_futures=True)
+
+
+def _keep_agency(frames: Iterator[pl.DataFrame], agency_filter: Optional[str]) -> Iterator[pl.DataFrame]:
+    """Drop empty frames and, with agency_filter, frames of other agencies."""
+    # A snapshot frame holds a single agency, so checking its first row is enough.
+    for df in frames:
+        if not df.is_empty() and (not agency_filter or df["agency"][0] == agency_filter):
+            yield df
+
+
+def load_all_snapshots(
+    base_dir: Path,
+    feed_type: Literal["trip_updates", "vehicle_positions"],
+    workers: Optional[int] = None,
+    agency_filter: Optional[str] = None,
+) -> pl.DataFrame:
     """Load all snapshots of a given feed_type under base_dir into a single DataFrame.
 
+    Holds every row in memory; to convert snapshots to Parquet use
+    process_all_snapshots, which streams them to their partitions.
+
     Args:
         base_dir: base directory to search (recursively).
         feed_type: one of 'trip_updates' or 'vehicle_positions'.
+        workers: number of worker processes used to parse files
+            (None = os.cpu_count(), 1 = sequential). Fewer than 4 files are
+            always parsed sequentially.
+        agency_filter: if given, only snapshots of this agency are kept. Files
+            whose filename names another agency are skipped without being read.
 
     Returns:
         Concatenated pl.DataFrame (vertical). If no files found, returns an
         empty DataFrame with expected schema for the feed_type.
     """
-    pattern = f"gtfs_rt_{feed_type}_*.json"
-    files = list(base_dir.rglob(pattern))
-    if not files:
-        logger.info("No files found for pattern %s under %s", pattern, base_dir)
-        return _empty_trip_updates_df() if feed_type == "trip_updates" else _empty_vehicle_positions_df()
-
-    metas: List[tuple[Path, pd.Timestamp]] = []
-    for p in files:
-        try:
-            meta = parse_metadata_from_filename(p)
-            metas.append((p, meta["snapshot_ts_jst"]))
-        except ValueError:
-            logger.warning("Skipping file with invalid filename: %s", p)
-            continue
-
-    metas.sort(key=lambda x: x[1])
-    dfs: List[pl.DataFrame] = []
-    for p, _ in metas:
-        try:
-            if feed_type == "trip_updates":
-                df = load_trip_updates_from_json(p)
-            else:
-                df = load_vehicle_positions_from_json(p)
-            if df.is_empty():
-                continue
-            dfs.append(df)
-        except Exception as exc:
-            logger.exception("Failed to process %s: %s", p, exc)
-            continue
-
+    metas = _select_snapshots(base_dir, feed_type, agency_filter)
+    dfs = list(_iter_loaded(metas, feed_type, workers, agency_filter))
     if not dfs:
         return _empty_trip_updates_df() if feed_type == "trip_updates" else _empty_vehicle_positions_df()
 
-    try:
-        combined = pl.concat(dfs, how="vertical")
-    except Exception:
-        # fallback: reduce concatenation
-        combined = dfs[0]
-        for d in dfs[1:]:
-            combined = pl.concat([combined, d], how="vertical")
-    return combined
+    # Every loader frame carries the same explicit schema, so a single
+    # vertical concat always lines up. Chunks are kept as-is: the frame is
+    # only partitioned and written, which does not need contiguous memory.
+    return pl.concat(dfs, how="vertical_relaxed", rechunk=False)
+
+# Low-cardinality columns (per partition file) that benefit from dictionary encoding.
+_DICTIONARY_COLS = (
+    "snapshot_filename",
+    "agency",
+    "date_str_jst",
+    "route_id",
+    "direction_id",
+    "start_date",
+    "start_time",
+    "current_status",
+)
+_ROW_GROUP_SIZE = 131072
+
 
 def save_to_parquet_partitioned(df: pl.DataFrame, output_base_dir: Path, agency: str, feed_type: str, date_str_jst: str) -> Path:
     """Save given DataFrame as Parquet under output_base_dir/agency/feed_type/date_str.parquet.
@@ -504,7 +953,16 @@ def save_to_parquet_partitioned(df: pl.DataFrame, output_base_dir: Path, agency:
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = out_dir / f"{date_str_jst}.parquet"
     try:
-        df.write_parquet(out_path, compression="zstd")
+        # Row-group statistics let later scans prune on agency/date/snapshot_ts.
+        df.write_parquet(
+            out_path,
+            compression="zstd",
+            compression_level=3,
+            row_group_size=_ROW_GROUP_SIZE,
+            statistics=True,
+            use_pyarrow=True,
+            pyarrow_options={"use_dictionary": [c for c in _DICTIONARY_COLS if c in df.columns]},
+        )
     except Exception:
         try:
             df.to_pandas().to_parquet(out_path, compression="zstd", engine="pyarrow")
@@ -514,66 +972,125 @@ def save_to_parquet_partitioned(df: pl.DataFrame, output_base_dir: Path, agency:
     return out_path
 
 
-def to_pandas_if_needed(df: pl.DataFrame, as_pandas: bool) -> Union[pl.DataFrame, pd.DataFrame]:
-    """Return pandas.DataFrame if as_pandas True, otherwise return polars.DataFrame.
+class _PartitionWriter:
+    """Streams the rows of one agency/feed_type/date partition into its Parquet file.
 
-    Args:
-        df: polars DataFrame
-        as_pandas: whether to return pandas
+    Snapshot tables are buffered until a full row group is collected (or the
+    partition is closed), so the file does not end up with one tiny row group
+    per snapshot. Rows go to a temporary file that replaces the partition file
+    only on close(); a run that dies half-way leaves earlier partition files
+    untouched.
     """
-    if as_pandas:
-        return df.to_pandas()
-    return df
 
+    def __init__(self, out_path: Path, schema: pa.Schema) -> None:
+        self.out_path = out_path
+        self.rows = 0
+        self._tmp_path = out_path.with_name(out_path.name + ".tmp")
+        self._pending: List[pa.Table] = []
+        self._pending_rows = 0
+        self._writer = pq.ParquetWriter(
+            self._tmp_path,
+            schema,
+            compression="zstd",
+            compression_level=3,
+            write_statistics=True,
+            use_dictionary=[c for c in _DICTIONARY_COLS if c in schema.names],
+        )
+
+    def write(self, table: pa.Table) -> None:
+        self._pending.append(table)
+        self._pending_rows += table.num_rows
+        self.rows += table.num_rows
+        if self._pending_rows < _ROW_GROUP_SIZE:
+            return
+        # Write whole row groups only; the remainder waits for the next snapshot.
+        pending = pa.concat_tables(self._pending)
+        full = self._pending_rows - self._pending_rows % _ROW_GROUP_SIZE
+        self._writer.write_table(pending.slice(0, full), row_group_size=_ROW_GROUP_SIZE)
+        self._pending = [pending.slice(full)]
+        self._pending_rows -= full
+
+    def close(self) -> None:
+        if self._pending_rows:
+            self._writer.write_table(pa.concat_tables(self._pending), row_group_size=_ROW_GROUP_SIZE)
+        self._writer.close()
+        os.replace(self._tmp_path, self.out_path)
+
+    def abort(self) -> None:
+        self._writer.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+
+def _close_partitions(writers: Dict[Tuple[str, str], _PartitionWriter], written: Dict[Tuple[str, str], Path]) -> None:
+    """Close every open partition writer, moving the finished ones into written."""
+    for key in sorted(writers):
+        writer = writers[key]
+        try:
+            writer.close()
+            written[key] = writer.out_path
+            logger.info("Saved %s rows to %s", writer.rows, writer.out_path)
+        except Exception as exc:
+            logger.exception("Failed saving partition agency=%s date=%s: %s", key[0], key[1], exc)
+            writer.abort()
+    writers.clear()
+
+
+def process_all_snapshots(
+    base_dir: Path,
+    feed_type: Literal["trip_updates", "vehicle_positions"],
+    output_dir: Path,
+    workers: Optional[int] = None,
+    agency_filter: Optional[str] = None,
+) -> Dict[Tuple[str, str], Path]:
+    """Convert all snapshots of feed_type under base_dir into Parquet partitions.
+
+    Each snapshot frame is written straight to output_dir/agency/feed_type/date_str.parquet
+    as soon as it is parsed. Snapshots arrive in snapshot_ts_jst order, so a
+    day's partitions are finished and closed as soon as the next day shows up:
+    only the current day's partitions are open, each buffering at most one row
+    group, instead of the whole input being held in memory.
 
-def _group_and_save(df: pl.DataFrame, output_dir: Path, feed_type: str, agency_filter: Optional[str], as_pandas: bool) -> None:
-    """Group DataFrame by agency and date_str and save partitions.
+    Args:
+        base_dir: base directory to search (recursively).
+        feed_type: one of 'trip_updates' or 'vehicle_positions'.
+        output_dir: base directory of the Parquet partitions.
+        workers: number of worker processes used to parse files
+            (None = os.cpu_count(), 1 = sequential).
+        agency_filter: if given, only snapshots of this agency are written.
 
-    This helper expects a polars DataFrame `df` that contains `agency` and `date_str` columns.
+    Returns:
+        Mapping of (agency, date_str_jst) to the written parquet file.
     """
-    if df.is_empty():
-        logger.info("No records to save for feed_type=%s", feed_type)
-        return
-
-    # Optionally convert to pandas for consumers, but saving uses polars internally.
-    pandas_mode = as_pandas
-    if pandas_mode:
-        df_for_inspect = df.to_pandas()
-    else:
-        df_for_inspect = df
-
-    # Determine unique agencies
-    if pandas_mode:
-        agencies = sorted(df_for_inspect["agency"].dropna().unique())
-    else:
-        agencies = [a for a in df.select("agency").unique().to_series().to_list() if a is not None]
-
-    for agency in agencies:
-        if agency_filter and agency != agency_filter:
-            continue
-        if pandas_mode:
-            sub = df_for_inspect[df_for_inspect["agency"] == agency]
-            date_strs = sorted(sub["date_str_jst"].dropna().unique())
-        else:
-            sub = df.filter(pl.col("agency") == agency)
-            date_strs = [d for d in sub.select("date_str_jst").unique().to_series().to_list() if d is not None]
-
-        for date_str in date_strs:
-            try:
-                if pandas_mode:
-                    part_pd = sub[sub["date_str_jst"] == date_str]
-                    part_pl = pl.from_pandas(part_pd)
-                else:
-                    part_pl = sub.filter(pl.col("date_str_jst") == date_str)
-
-                if part_pl.is_empty():
-                    continue
-
-                out_path = save_to_parquet_partitioned(part_pl, output_dir, agency, feed_type, date_str)
-                logger.info("Saved %s rows to %s", part_pl.height, out_path)
-            except Exception as exc:
-                logger.exception("Failed saving partition agency=%s date=%s: %s", agency, date_str, exc)
+    metas = _select_snapshots(base_dir, feed_type, agency_filter)
+    writers: Dict[Tuple[str, str], _PartitionWriter] = {}
+    written: Dict[Tuple[str, str], Path] = {}
+    current_date: Optional[str] = None
+    try:
+        for df in _iter_loaded(metas, feed_type, workers, agency_filter):
+            # The loaders stamp every row of a snapshot with its filename metadata.
+            key = (df["agency"][0], df["date_str_jst"][0])
+            if None in key:
                 continue
+            if key[1] != current_date:
+                # Dates only move forward, so every open partition is complete.
+                _close_partitions(writers, written)
+                current_date = key[1]
+            table = df.to_arrow()
+            writer = writers.get(key)
+            if writer is None:
+                out_dir = output_dir / key[0] / feed_type
+                out_dir.mkdir(parents=True, exist_ok=True)
+                writer = writers[key] = _PartitionWriter(out_dir / f"{key[1]}.parquet", table.schema)
+            writer.write(table)
+    except BaseException:
+        for writer in writers.values():
+            writer.abort()
+        raise
+    _close_partitions(writers, written)
+
+    if not written:
+        logger.info("No records to save for feed_type=%s", feed_type)
+    return written
 
 
 def main(argv: Optional[List[str]] = None) -> None:
@@ -587,7 +1104,7 @@ def main(argv: Optional[List[str]] = None) -> None:
     parser.add_argument("--output-dir", type=Path, default=Path("./data/bronze"))
     parser.add_argument("--feed-type", choices=["trip_updates", "vehicle_positions", "both"], default="both")
     parser.add_argument("--agency-filter", type=str, default="", help="Only process this agency if provided")
-    parser.add_argument("--as-pandas", action="store_true", help="Convert DataFrame to pandas for downstream consumers (internally still writes parquet via polars)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for parsing JSON (default: CPU count, 1 = sequential)")
     args = parser.parse_args(argv)
 
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
@@ -600,16 +1117,10 @@ def main(argv: Optional[List[str]] = None) -> None:
 
     for ft in feed_types:
         try:
-            logger.info("Loading feed_type=%s from %s", ft, args.input_dir)
-            df = load_all_snapshots(args.input_dir, ft)  # pl.DataFrame
-            logger.info("Loaded %s records for feed_type=%s", df.height, ft)
-
-            # Optionally convert to pandas for downstream work. We'll keep a polars copy
-            # for saving; if as_pandas is requested we still allow inspection in pandas.
-            if args.as_pandas:
-                _ = to_pandas_if_needed(df, True)
-
-            _group_and_save(df, args.output_dir, ft, args.agency_filter or None, args.as_pandas)
+            logger.info("Processing feed_type=%s from %s", ft, args.input_dir)
+            process_all_snapshots(
+                args.input_dir, ft, args.output_dir, workers=args.workers, agency_filter=args.agency_filter or None
+            )
         except Exception:
             logger.exception("Unhandled error while processing feed_type=%s", ft)
             continue
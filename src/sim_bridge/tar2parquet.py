@@ -4,6 +4,7 @@ Extract JSON from tar archives and save as normalized Parquet files (DuckDB-acce
 tarアーカイブからJSONを抽出し、正規化されたParquetファイルとして保存（DuckDB高速化版）
 """
 import argparse
+import multiprocessing
 import tarfile
 import os
 import json
@@ -264,6 +265,10 @@ class _TarMockPath:
         """Return file-like object for reading / 読み込み用のファイル風オブジェクトを返す"""
         return io.TextIOWrapper(io.BytesIO(self._content), encoding=encoding)
 
+    def read_bytes(self) -> bytes:
+        """Return raw file content like pathlib.Path.read_bytes / 生のファイル内容を返す"""
+        return self._content
+
 
 def _process_single_json(args: Tuple[str, bytes, str]) -> Optional[Tuple[str, pl.DataFrame]]:
     """
@@ -451,7 +456,10 @@ def process_tar_to_normalized_parquet(
     
     if workers > 1:
         # Parallel processing / 並列処理
-        with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Spawn, not fork: polars is already running threads in this process
+        # and the loaders evaluate polars expressions, which deadlocks in a
+        # forked child. / forkではなくspawnでワーカーを起動
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
             futures = {executor.submit(_process_single_json, task): task for task in json_tasks}
             
             iterator = as_completed(futures)